@@ -9,6 +9,7 @@ live markdown preview, and auto-save.
 import io
 import os
 import re
+import tempfile
 from datetime import datetime
 from pathlib import Path
 
@@ -92,6 +93,37 @@ def build_frontmatter(metadata: dict) -> str:
     return "\n".join(lines)
 
 
+def set_frontmatter_field(content: str, key: str, value: str) -> str:
+    """Set a single frontmatter field, leaving the other fields and the body untouched."""
+    lines = content.split("\n")
+    header_end = len(lines)
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped:
+            header_end = i
+            break
+        if ":" in stripped and stripped.partition(":")[0].strip().lower() == key:
+            lines[i] = f"{key.capitalize()}: {value}"
+            return "\n".join(lines)
+    lines.insert(header_end, f"{key.capitalize()}: {value}")
+    return "\n".join(lines)
+
+
+def write_text_atomic(filepath: Path, content: str) -> None:
+    """Write a file via a temporary file and rename, so readers never see it half-written."""
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        # mkstemp creates the file as 0600, keep the original permissions
+        mode = filepath.stat().st_mode & 0o777 if filepath.exists() else 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 def get_post_list() -> list[dict]:
     """Get list of all blog posts with metadata, sorted by date (most recent first)."""
     posts = []
@@ -254,7 +286,7 @@ def save_post(filename: str):
     body = data.get("body", "")
 
     content = build_frontmatter(metadata) + "\n\n" + body
-    filepath.write_text(content, encoding="utf-8")
+    write_text_atomic(filepath, content)
 
     return jsonify({"success": True, "filename": filename})
 
@@ -379,6 +411,23 @@ def upload_image():
     })
 
 
+@app.route("/api/images/<path:filename>", methods=["DELETE"])
+def delete_image(filename: str):
+    """Delete an image that no post references."""
+    filepath = IMAGES_DIR / filename
+    if Path(os.path.normpath(filepath)).parent != IMAGES_DIR:
+        return jsonify({"error": "Invalid filename"}), 400
+    if not filepath.is_file():
+        return jsonify({"error": "Image not found"}), 404
+
+    posts = find_posts_with_image(filename)
+    if posts:
+        return jsonify({"error": "Image is still referenced by posts", "posts": posts}), 400
+
+    filepath.unlink()
+    return jsonify({"success": True, "filename": filename})
+
+
 def find_posts_with_image(filename: str) -> list[dict]:
     """Find all posts that reference a given image filename."""
     posts_with_refs = []
@@ -408,6 +457,39 @@ def update_image_references(content: str, old_filename: str, new_filename: str)
     return content.replace(old_ref, new_ref)
 
 
+def resolve_image_rename(filename: str, new_name: str | None) -> tuple[str | None, str | None]:
+    """
+    Validate renaming an image to new_name (without extension).
+    Returns (new_filename, None) if valid, or (None, error_message).
+    """
+    if not new_name:
+        return None, "New name is required"
+
+    # Get the new name (without extension) and preserve the original extension
+    new_name_base = new_name.strip()
+    if not new_name_base:
+        return None, "New name cannot be empty"
+
+    # Sanitize the new name
+    new_name_base = sanitize_filename(new_name_base)
+    if not new_name_base:
+        return None, "Invalid filename after sanitization"
+
+    # Preserve the original extension
+    _, ext = os.path.splitext(filename)
+    new_filename = new_name_base + ext
+
+    # Check if it's the same name
+    if new_filename == filename:
+        return None, "New name is the same as current name"
+
+    # Check for conflicts
+    if (IMAGES_DIR / new_filename).exists():
+        return None, f"An image named '{new_filename}' already exists"
+
+    return new_filename, None
+
+
 @app.route("/api/images/<path:filename>/references", methods=["GET"])
 def get_image_references(filename: str):
     """Get list of posts that reference a given image."""
@@ -431,31 +513,13 @@ def rename_image(filename: str):
         return jsonify({"error": "Image not found"}), 404
 
     data = request.get_json()
-    if not data or not data.get("new_name"):
+    if not data:
         return jsonify({"error": "New name is required"}), 400
 
-    # Get the new name (without extension) and preserve the original extension
-    new_name_base = data["new_name"].strip()
-    if not new_name_base:
-        return jsonify({"error": "New name cannot be empty"}), 400
-
-    # Sanitize the new name
-    new_name_base = sanitize_filename(new_name_base)
-    if not new_name_base:
-        return jsonify({"error": "Invalid filename after sanitization"}), 400
-
-    # Preserve the original extension
-    _, ext = os.path.splitext(filename)
-    new_filename = new_name_base + ext
-
-    # Check if it's the same name
-    if new_filename == filename:
-        return jsonify({"error": "New name is the same as current name"}), 400
-
-    # Check for conflicts
+    new_filename, error = resolve_image_rename(filename, data.get("new_name"))
+    if error:
+        return jsonify({"error": error}), 400
     new_filepath = IMAGES_DIR / new_filename
-    if new_filepath.exists():
-        return jsonify({"error": f"An image named '{new_filename}' already exists"}), 400
 
     # Find and update all posts with references
     posts_updated = []
@@ -464,7 +528,7 @@ def rename_image(filename: str):
             content = post_filepath.read_text(encoding="utf-8")
             if f"{{static}}/images/{filename}" in content:
                 updated_content = update_image_references(content, filename, new_filename)
-                post_filepath.write_text(updated_content, encoding="utf-8")
+                write_text_atomic(post_filepath, updated_content)
                 metadata, _ = parse_frontmatter(content)
                 posts_updated.append({
                     "filename": post_filepath.name,
@@ -483,7 +547,7 @@ def rename_image(filename: str):
             try:
                 content = post_filepath.read_text(encoding="utf-8")
                 rollback_content = update_image_references(content, new_filename, filename)
-                post_filepath.write_text(rollback_content, encoding="utf-8")
+                write_text_atomic(post_filepath, rollback_content)
             except Exception:
                 pass
         return jsonify({"error": f"Failed to rename file: {e}"}), 500
@@ -496,6 +560,140 @@ def rename_image(filename: str):
     })
 
 
+POST_STATUSES = {"draft", "published"}
+
+
+@app.route("/api/batch", methods=["POST"])
+def batch_operations():
+    """
+    Apply several operations in one request.
+
+    Takes {"operations": [...]}, where each operation is one of:
+      {"op": "set_status", "filename": "post.md", "status": "published"}
+      {"op": "rename_image", "filename": "old.png", "new_name": "new"}
+
+    Operations are applied in order. All post changes are made in a single
+    pass over the blog posts, with one atomic write per modified post no
+    matter how many operations touch it. Returns one result per operation.
+
+    Updating the posts is all-or-nothing: if writing any post fails, the
+    posts already written and the image renames are rolled back, and every
+    operation that had succeeded is reported as failed.
+    """
+    data = request.get_json()
+    if not isinstance(data, dict) or not isinstance(data.get("operations"), list):
+        return jsonify({"error": "A list of operations is required"}), 400
+
+    results = []
+    # Image renames that succeeded, in order: (old_filename, new_filename)
+    renames = []
+    # Post filename -> list of (result index, new status)
+    status_changes = {}
+
+    for index, op in enumerate(data["operations"]):
+        if not isinstance(op, dict):
+            results.append({"success": False, "error": "Invalid operation"})
+            continue
+        kind = op.get("op")
+        filename = op.get("filename") or ""
+        result = {"op": kind, "filename": filename}
+        results.append(result)
+
+        if not isinstance(filename, str):
+            result.update(success=False, error="Invalid filename")
+
+        elif kind == "set_status":
+            status = op.get("status")
+            filepath = BLOG_DIR / os.path.basename(filename)
+            if status not in POST_STATUSES:
+                result.update(success=False, error=f"Invalid status: {status!r}")
+            elif filepath.suffix != ".md":
+                result.update(success=False, error="Not a blog post")
+            elif not filepath.is_file():
+                result.update(success=False, error="Post not found")
+            else:
+                status_changes.setdefault(filepath.name, []).append((index, status))
+                result.update(success=True, status=status)
+
+        elif kind == "rename_image":
+            filepath = IMAGES_DIR / filename
+            # Don't let "../" move files from outside the images directory
+            if Path(os.path.normpath(filepath)).parent != IMAGES_DIR:
+                result.update(success=False, error="Invalid filename")
+                continue
+            if not filename or not filepath.is_file():
+                result.update(success=False, error="Image not found")
+                continue
+            new_filename, error = resolve_image_rename(filename, op.get("new_name"))
+            if error:
+                result.update(success=False, error=error)
+                continue
+            # Rename the image right away, so later operations in the batch see the new name
+            try:
+                filepath.rename(IMAGES_DIR / new_filename)
+            except Exception as e:
+                result.update(success=False, error=f"Failed to rename file: {e}")
+                continue
+            renames.append((filename, new_filename))
+            result.update(success=True, new_filename=new_filename, updated_posts=[])
+
+        else:
+            result.update(success=False, error=f"Unknown operation: {kind!r}")
+
+    rename_results = [r for r in results if r.get("op") == "rename_image" and r["success"]]
+    posts_updated = []
+    if renames or status_changes:
+        # Posts written so far, with their original content, for rollback
+        written = []
+        try:
+            for post_filepath in BLOG_DIR.glob("*.md"):
+                content = post_filepath.read_text(encoding="utf-8")
+                updated_content = content
+                # Renames with references in this post
+                touched = []
+                for (old_filename, new_filename), rename_result in zip(renames, rename_results):
+                    if f"{{static}}/images/{old_filename}" in updated_content:
+                        updated_content = update_image_references(
+                            updated_content, old_filename, new_filename
+                        )
+                        touched.append(rename_result)
+                for _, status in status_changes.get(post_filepath.name, []):
+                    updated_content = set_frontmatter_field(updated_content, "status", status)
+                if updated_content != content:
+                    write_text_atomic(post_filepath, updated_content)
+                    written.append((post_filepath, content))
+                    for rename_result in touched:
+                        rename_result["updated_posts"].append(post_filepath.name)
+        except Exception as e:
+            print(f"Error updating {post_filepath}: {e}")
+            # Rollback post updates, then the image renames (newest first, so
+            # chained renames in the batch unwind correctly)
+            for written_filepath, original_content in reversed(written):
+                try:
+                    write_text_atomic(written_filepath, original_content)
+                except Exception:
+                    pass
+            for old_filename, new_filename in reversed(renames):
+                try:
+                    (IMAGES_DIR / new_filename).rename(IMAGES_DIR / old_filename)
+                except Exception:
+                    pass
+            error = f"Failed to update {post_filepath.name}, batch rolled back: {e}"
+            for result in results:
+                if result.get("success"):
+                    result.pop("updated_posts", None)
+                    result.pop("new_filename", None)
+                    result.update(success=False, error=error)
+        else:
+            posts_updated = [post_filepath.name for post_filepath, _ in written]
+
+    return jsonify({
+        "success": all(r["success"] for r in results),
+        "results": results,
+        "updated_posts": sorted(posts_updated),
+    })
+
+
 @app.route("/static/images/<path:filename>")
 def serve_image(filename: str):
     """Serve images for preview."""
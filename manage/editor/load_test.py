@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Load test for the blog editor API.
+
+Simulates several editor tabs hitting the server at once: listing posts,
+autosaving, uploading images and looking up image references. Reports
+throughput and p50/p95/p99 latency per route, and checks that no post
+ends up torn or corrupted.
+
+By default it starts the editor in-process (threaded werkzeug server,
+like `app.run`) against a temporary copy of site/, so the real posts are
+never touched. With --url it targets an already running instance instead;
+that instance should still be serving a scratch checkout: synthetic posts
+and images are written into its site/, and only deleted after the run.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import http.client
+import io
+import json
+import logging
+import math
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+from PIL import Image
+
+# Relative weight of each action in the request mix
+DEFAULT_MIX = "list=15,get=15,autosave=55,upload=5,refs=10"
+
+CHECKSUM_MARKER = "<!-- loadtest-checksum:"
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            weights[name.strip()] = int(weight)
+        except ValueError:
+            raise SystemExit(f"Error: invalid --mix entry {part!r}, expected action=weight")
+    unknown = set(weights) - set(ACTIONS)
+    if unknown:
+        raise SystemExit(f"Error: unknown actions in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def make_body(title: str, seq: int, size: int) -> str:
+    """Build a post body that ends with a checksum of everything before it."""
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "odin", "feed", "editor"]
+    text = " ".join(random.choice(words) for _ in range(size // 6))
+    payload = f"Autosave {seq} of {title}\n\n{text}\n"
+    digest = hashlib.sha256(f"{title}\n{payload}".encode()).hexdigest()
+    return f"{payload}{CHECKSUM_MARKER} {digest} -->"
+
+
+def is_intact(title: str, body: str) -> bool:
+    """Check that a body produced by make_body wasn't torn or mixed up."""
+    payload, marker, rest = body.rpartition(CHECKSUM_MARKER)
+    if not marker:
+        return False
+    digest = hashlib.sha256(f"{title}\n{payload}".encode()).hexdigest()
+    return rest.strip() == f"{digest} -->"
+
+
+def make_image(width: int, height: int) -> bytes:
+    img = Image.new("RGB", (width, height))
+    # Random blocks, so the encoder has some actual work to do
+    for _ in range(20):
+        box = (
+            random.randrange(width), random.randrange(height),
+            random.randrange(width), random.randrange(height),
+        )
+        color = tuple(random.randrange(256) for _ in range(3))
+        img.paste(color, (min(box[0], box[2]), min(box[1], box[3]), max(box[0], box[2]), max(box[1], box[3])))
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=95)
+    return output.getvalue()
+
+
+class Client:
+    """One keep-alive HTTP connection, recording latency per route."""
+
+    def __init__(self, host: str, port: int, stats: "Stats"):
+        self.host = host
+        self.port = port
+        self.stats = stats
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+
+    def request(self, route: str, method: str, path: str, body: bytes | None = None,
+                headers: dict | None = None) -> tuple[int, bytes]:
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=body, headers=headers or {})
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            status, data = 0, b""
+        self.stats.record(route, time.perf_counter() - start, 200 <= status < 300)
+        return status, data
+
+    def json(self, route: str, method: str, path: str, payload=None) -> tuple[int, dict | list | None]:
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        status, data = self.request(route, method, path, body, headers)
+        try:
+            return status, json.loads(data)
+        except ValueError:
+            return status, None
+
+    def upload(self, filename: str, data: bytes) -> tuple[int, dict | None]:
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        status, data = self.request("POST /api/images", "POST", "/api/images", body, headers)
+        try:
+            return status, json.loads(data)
+        except ValueError:
+            return status, None
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.torn_reads = 0
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def report(self, elapsed: float) -> None:
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)\n")
+        print(f"{'route':<42} {'count':>6} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            print(
+                f"{route:<42} {len(values):>6} {self.errors.get(route, 0):>6} "
+                f"{len(values) / elapsed:>7.1f} "
+                f"{percentile(values, 50) * 1000:>8.1f} "
+                f"{percentile(values, 95) * 1000:>8.1f} "
+                f"{percentile(values, 99) * 1000:>8.1f}"
+            )
+
+
+class Tab:
+    """A simulated editor tab, editing one of the synthetic posts."""
+
+    def __init__(self, client: Client, post: dict, images: list[str], uploaded: list[str], args):
+        self.client = client
+        self.post = post
+        self.images = images
+        self.uploaded = uploaded
+        self.args = args
+        self.seq = 0
+
+    def list(self) -> None:
+        self.client.json("GET /api/posts", "GET", "/api/posts")
+
+    def get(self) -> None:
+        status, data = self.client.json(
+            "GET /api/posts/<filename>", "GET", f"/api/posts/{self.post['filename']}"
+        )
+        if status == 200 and data and not is_intact(data["title"], data["body"]):
+            with self.client.stats.lock:
+                self.client.stats.torn_reads += 1
+
+    def autosave(self) -> None:
+        self.seq += 1
+        self.client.json("PUT /api/posts/<filename>", "PUT", f"/api/posts/{self.post['filename']}", {
+            "title": self.post["title"],
+            "date": self.post["date"],
+            "status": "draft",
+            "body": make_body(self.post["title"], self.seq, self.args.post_size),
+        })
+
+    def upload(self) -> None:
+        data = make_image(*self.args.image_size)
+        status, result = self.client.upload(f"loadtest_{uuid.uuid4().hex[:8]}.jpg", data)
+        if status == 200 and result:
+            self.images.append(result["filename"])
+            self.uploaded.append(result["filename"])
+
+    def refs(self) -> None:
+        if not self.images:
+            return
+        filename = random.choice(self.images)
+        self.client.json(
+            "GET /api/images/<filename>/references", "GET",
+            f"/api/images/{quote(filename)}/references",
+        )
+
+
+ACTIONS = {
+    "list": Tab.list,
+    "get": Tab.get,
+    "autosave": Tab.autosave,
+    "upload": Tab.upload,
+    "refs": Tab.refs,
+}
+
+
+def create_posts(client: Client, count: int, post_size: int) -> list[dict]:
+    posts = []
+    for i in range(count):
+        title = f"Load test post {i} {uuid.uuid4().hex[:6]}"
+        status, data = client.json("POST /api/posts", "POST", "/api/posts", {"title": title})
+        if status != 200 or not data:
+            raise SystemExit(f"Error: could not create synthetic post ({status})")
+        post = {"filename": data["filename"], "title": title, "date": data["date"]}
+        client.json("PUT /api/posts/<filename>", "PUT", f"/api/posts/{post['filename']}", {
+            "title": title,
+            "date": post["date"],
+            "status": "draft",
+            "body": make_body(title, 0, post_size),
+        })
+        posts.append(post)
+    return posts
+
+
+def run_tab(tab: Tab, mix: dict[str, int], deadline: float, interval: float) -> None:
+    names = list(mix)
+    weights = list(mix.values())
+    while time.monotonic() < deadline:
+        action = random.choices(names, weights=weights)[0]
+        ACTIONS[action](tab)
+        if interval:
+            time.sleep(random.uniform(0, 2 * interval))
+
+
+def check_posts(client: Client, posts: list[dict], blog_dir: Path | None) -> list[str]:
+    """Return the problems found in the synthetic posts after the run."""
+    problems = []
+    for post in posts:
+        status, data = client.json("GET /api/posts/<filename>", "GET", f"/api/posts/{post['filename']}")
+        if status != 200 or not data:
+            problems.append(f"{post['filename']}: could not be read back ({status})")
+        elif data["title"] != post["title"] or not is_intact(post["title"], data["body"]):
+            problems.append(f"{post['filename']}: content is torn or corrupted")
+    if blog_dir is not None:
+        for leftover in blog_dir.glob(".*.tmp"):
+            problems.append(f"{leftover.name}: leftover temporary file")
+    return problems
+
+
+@contextlib.contextmanager
+def local_server(site_dir: Path):
+    """Run the editor app on a random port, against a copy of site_dir."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import editor_server
+    from werkzeug.serving import make_server
+
+    with tempfile.TemporaryDirectory(prefix="editor-load-test-") as tmp:
+        tmp_site = Path(tmp) / "site"
+        shutil.copytree(site_dir / "blog", tmp_site / "blog")
+        shutil.copytree(site_dir / "images", tmp_site / "images")
+        editor_server.BLOG_DIR = tmp_site / "blog"
+        editor_server.IMAGES_DIR = tmp_site / "images"
+
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", 0, editor_server.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield "127.0.0.1", server.server_port, editor_server.BLOG_DIR
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the blog editor API")
+    parser.add_argument("--url", help="Target a running editor instead of an in-process one")
+    parser.add_argument("--concurrency", type=int, default=8, help="Number of simulated tabs (default: 8)")
+    parser.add_argument("--posts", type=int, default=4,
+                        help="Number of synthetic posts shared by the tabs (default: 4)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default: 10)")
+    parser.add_argument("--interval", type=float, default=0.0,
+                        help="Mean think time between a tab's requests in seconds (default: 0, no pause)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Action weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--post-size", type=int, default=8000, help="Approximate post body size in bytes")
+    parser.add_argument("--image-size", type=int, nargs=2, default=(1600, 900), metavar=("W", "H"),
+                        help="Size of uploaded images (default: 1600 900)")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    site_dir = Path(__file__).resolve().parent.parent.parent / "site"
+    if args.url:
+        parts = urlsplit(args.url)
+        server = contextlib.nullcontext((parts.hostname, parts.port or 80, None))
+    else:
+        server = local_server(site_dir)
+
+    stats = Stats()
+    with server as (host, port, blog_dir):
+        setup = Client(host, port, Stats())
+        posts = create_posts(setup, args.posts, args.post_size)
+        status, images = setup.json("GET /api/images", "GET", "/api/images")
+        image_names = [image["filename"] for image in images or []]
+        uploaded = []
+
+        print(f"Running {args.concurrency} tabs on {len(posts)} posts for {args.duration:.0f}s "
+              f"against {'http://%s:%d' % (host, port)}...")
+        tabs = [
+            Tab(Client(host, port, stats), posts[i % len(posts)], image_names, uploaded, args)
+            for i in range(args.concurrency)
+        ]
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(target=run_tab, args=(tab, weights, deadline, args.interval))
+            for tab in tabs
+        ]
+        start = time.monotonic()
+        # The editor prints a line per processed image, keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.monotonic() - start
+
+        problems = check_posts(setup, posts, blog_dir)
+        if args.url:
+            for post in posts:
+                setup.json("DELETE /api/posts/<filename>", "DELETE", f"/api/posts/{post['filename']}")
+            for filename in uploaded:
+                setup.json("DELETE /api/images/<filename>", "DELETE", f"/api/images/{quote(filename)}")
+
+    stats.report(elapsed)
+    print(f"\nTorn reads during the run: {stats.torn_reads}")
+    if problems:
+        print("Integrity check FAILED:")
+        for problem in problems:
+            print(f"  {problem}")
+        raise SystemExit(1)
+    print(f"Integrity check passed: {len(posts)} posts intact")
+    if stats.torn_reads:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
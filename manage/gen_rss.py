@@ -7,19 +7,51 @@ extracts content from rendered HTML, writes feed.xml to output dir.
 """
 
 import argparse
+import functools
+import io
 import json
+import re
+import threading
+import time
 import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
 from email.utils import format_datetime
+from html import escape
 from pathlib import Path
+from typing import Callable
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment, Tag
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 BLOG_DIR = BASE_DIR / "site" / "blog"
 CONFIG_FILE = BASE_DIR / "config_sitegen.json"
 
+FEED_SIZE = 20
+
+# Marker that ends the summary of a post, same as sitegen
+SUMMARY_MARKER = "PELICAN_END_SUMMARY"
+
+# Elements where whitespace is significant and is kept as-is when minifying
+PRESERVE_WHITESPACE_TAGS = ["pre", "code", "textarea", "script", "style"]
+
+# Elements that whitespace can be dropped around when minifying
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "center", "dd", "div", "dl",
+    "dt", "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5",
+    "h6", "header", "hr", "li", "ol", "p", "pre", "section", "table",
+    "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+
+# Only HTML whitespace: \s would also match non-breaking and other Unicode
+# spaces, which are meant to be rendered
+WHITESPACE_RE = re.compile(r"[ \t\n\r\f]+")
+
+# How long to wait for filesystem events to settle before regenerating in --watch mode
+WATCH_DEBOUNCE_SECONDS = 0.1
+
 
 def parse_frontmatter(content: str) -> tuple[dict, str]:
     lines = content.split("\n")
@@ -63,11 +95,12 @@ def get_output_path(md_file: Path, meta: dict, output_dir: Path) -> Path | None:
     return output_dir / date_path / f"{slug}.html"
 
 
-def extract_content(html_file: Path, article_url: str) -> str:
-    soup = BeautifulSoup(html_file.read_text(encoding="utf-8"), "html.parser")
+def find_entry_content(html: str) -> Tag | None:
+    """Return the article's entry-content div, stripped of post metadata."""
+    soup = BeautifulSoup(html, "html.parser")
     entry_div = soup.find("div", class_="entry-content")
     if not entry_div:
-        return ""
+        return None
 
     # Remove the post-info footer (metadata block)
     post_info = entry_div.find("footer", class_="post-info")
@@ -79,66 +112,178 @@ def extract_content(html_file: Path, article_url: str) -> str:
     if taglist:
         taglist.decompose()
 
+    return entry_div
+
+
+def cut_at_summary(entry_div: Tag, article_url: str) -> bool:
+    """
+    Drop everything after the PELICAN_END_SUMMARY marker, replacing it with
+    a link to the full article. Like sitegen, the marker may be an HTML
+    comment or plain text anywhere in the post. Returns False if the post
+    has no marker.
+    """
+    # Comment is a NavigableString too, so this finds either form, first one wins
+    marker = entry_div.find(string=lambda s: SUMMARY_MARKER in s)
+    if marker is None:
+        return False
+
+    # The marker may be nested, drop what follows it at every level up to entry-content
+    node = marker
+    while node is not entry_div:
+        for sibling in list(node.next_siblings):
+            sibling.extract()
+        node = node.parent
+
+    parent = marker.parent
+    before = "" if isinstance(marker, Comment) else marker[: marker.index(SUMMARY_MARKER)]
+    if before.strip():
+        marker.replace_with(before)
+    else:
+        marker.extract()
+        # Drop elements left empty by removing the marker, e.g. its <p>
+        while parent is not entry_div and not parent.get_text(strip=True) and not parent.find(True):
+            grandparent = parent.parent
+            parent.decompose()
+            parent = grandparent
+
+    more = BeautifulSoup(
+        f'<p><a href="{escape(article_url)}">Continue reading&hellip;</a></p>', "html.parser"
+    )
+    entry_div.append(more.p)
+    return True
+
+
+def minify_html(entry_div: Tag) -> None:
+    """
+    Remove comments and collapse whitespace, leaving preformatted content
+    alone. Whitespace is only dropped entirely between block-level elements,
+    where it isn't rendered anyway.
+    """
+    for comment in entry_div.find_all(string=lambda s: isinstance(s, Comment)):
+        comment.extract()
+
+    def is_block(node) -> bool:
+        return node is entry_div or (isinstance(node, Tag) and node.name in BLOCK_TAGS)
+
+    def is_block_boundary(text, sibling) -> bool:
+        # With no sibling, the text is at the edge of its parent, which is
+        # only a block boundary if the parent itself is a block
+        return is_block(text.parent if sibling is None else sibling)
+
+    for text in entry_div.find_all(string=True):
+        if text.find_parent(PRESERVE_WHITESPACE_TAGS):
+            continue
+        collapsed = WHITESPACE_RE.sub(" ", text)
+        if (
+            WHITESPACE_RE.fullmatch(text)
+            and is_block_boundary(text, text.previous_sibling)
+            and is_block_boundary(text, text.next_sibling)
+        ):
+            text.extract()
+        elif collapsed != text:
+            text.replace_with(collapsed)
+
+
+def extract_content(
+    html_file: Path, article_url: str, minify: bool = False, summary_only: bool = False
+) -> str:
+    return extract_content_from_html(
+        html_file.read_text(encoding="utf-8"), article_url, minify, summary_only
+    )
+
+
+def extract_content_from_html(
+    html: str, article_url: str, minify: bool = False, summary_only: bool = False
+) -> str:
+    entry_div = find_entry_content(html)
+    if not entry_div:
+        return ""
+
     # Resolve all relative URLs (src and href) to absolute using the article URL as base
     for tag, attr in [("img", "src"), ("a", "href"), ("source", "src")]:
         for el in entry_div.find_all(tag, **{attr: True}):
             el[attr] = urljoin(article_url, el[attr])
 
+    if summary_only:
+        cut_at_summary(entry_div, article_url)
+    if minify:
+        minify_html(entry_div)
+
     return entry_div.decode_contents().strip()
 
 
-def load_posts(output_dir: Path) -> list[dict]:
+def load_config() -> dict:
     with open(CONFIG_FILE) as f:
-        config = json.load(f)
-    siteurl = config["SITEURL"]
-    sitename = config["SITENAME"]
+        return json.load(f)
 
-    posts = []
-    for md_file in sorted(BLOG_DIR.glob("*.md")):
-        content = md_file.read_text(encoding="utf-8")
-        meta, _ = parse_frontmatter(content)
 
-        if meta.get("status", "").lower() != "published":
-            continue
+def load_post(md_file: Path, output_dir: Path, siteurl: str) -> dict | None:
+    """Load a post for the feed, or None if it's not a rendered published English post."""
+    content = md_file.read_text(encoding="utf-8")
+    meta, _ = parse_frontmatter(content)
 
-        lang = meta.get("lang", "").lower()
-        # Exclude non-English translations (e.g. pt-br)
-        if lang and lang != "en":
-            continue
+    if meta.get("status", "").lower() != "published":
+        return None
 
-        date_str = meta.get("date", "")
-        if not date_str:
-            continue
+    lang = meta.get("lang", "").lower()
+    # Exclude non-English translations (e.g. pt-br)
+    if lang and lang != "en":
+        return None
 
-        try:
-            dt = parse_date(date_str)
-        except ValueError:
-            continue
+    date_str = meta.get("date", "")
+    if not date_str:
+        return None
 
-        html_file = get_output_path(md_file, meta, output_dir)
-        if html_file is None or not html_file.exists():
-            continue
+    try:
+        dt = parse_date(date_str)
+    except ValueError:
+        return None
+
+    html_file = get_output_path(md_file, meta, output_dir)
+    if html_file is None or not html_file.exists():
+        return None
+
+    date_path = dt.strftime("%Y/%m/%d")
+    slug = md_file.stem
+    url = f"{siteurl}/{date_path}/{slug}.html"
 
-        date_path = dt.strftime("%Y/%m/%d")
-        slug = md_file.stem
-        url = f"{siteurl}/{date_path}/{slug}.html"
-
-        posts.append(
-            {
-                "title": meta.get("title", slug),
-                "url": url,
-                "date": dt,
-                "author": meta.get("author", ""),
-                "html_file": html_file,
-                "siteurl": siteurl,
-            }
-        )
+    return {
+        "title": meta.get("title", slug),
+        "url": url,
+        "date": dt,
+        "author": meta.get("author", ""),
+        "html_file": html_file,
+        "siteurl": siteurl,
+    }
+
+
+def find_published_posts(output_dir: Path, siteurl: str) -> list[dict]:
+    """Published English posts that have a rendered HTML file, newest first."""
+    posts = []
+    for md_file in sorted(BLOG_DIR.glob("*.md")):
+        post = load_post(md_file, output_dir, siteurl)
+        if post is not None:
+            posts.append(post)
 
     posts.sort(key=lambda p: p["date"], reverse=True)
-    return posts[:20], sitename, siteurl
+    return posts
 
 
-def build_rss(posts: list[dict], sitename: str, siteurl: str) -> ET.Element:
+def load_posts(output_dir: Path) -> list[dict]:
+    config = load_config()
+    siteurl = config["SITEURL"]
+    sitename = config["SITENAME"]
+
+    posts = find_published_posts(output_dir, siteurl)
+    return posts[:FEED_SIZE], sitename, siteurl
+
+
+def build_rss(
+    posts: list[dict],
+    sitename: str,
+    siteurl: str,
+    extract: Callable[[Path, str], str] = extract_content,
+) -> ET.Element:
     ET.register_namespace("content", "http://purl.org/rss/1.0/modules/content/")
     ET.register_namespace("atom", "http://www.w3.org/2005/Atom")
 
@@ -171,7 +316,7 @@ def build_rss(posts: list[dict], sitename: str, siteurl: str) -> ET.Element:
         if post["author"]:
             ET.SubElement(item, "author").text = post["author"]
 
-        content_html = extract_content(post["html_file"], post["url"])
+        content_html = extract(post["html_file"], post["url"])
         if content_html:
             encoded = ET.SubElement(item, "content:encoded")
             encoded.text = content_html
@@ -197,6 +342,252 @@ def indent_xml(elem: ET.Element, level: int = 0) -> None:
         elem.tail = "\n"
 
 
+def render_feed(rss: ET.Element) -> str:
+    indent_xml(rss)
+    tree = ET.ElementTree(rss)
+    out = io.StringIO()
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    tree.write(out, encoding="unicode", xml_declaration=False)
+    return out.getvalue()
+
+
+def apply_byte_budget(rss: ET.Element, max_bytes: int) -> list[dict]:
+    """
+    Keep feed items, newest first, only while the rendered feed stays
+    within max_bytes. Returns the byte cost of every item and whether it
+    was kept.
+    """
+    channel = rss.find("channel")
+    items = channel.findall("item")
+    for item in items:
+        channel.remove(item)
+
+    total = len(render_feed(rss).encode("utf-8"))
+    report = []
+    over_budget = False
+    for item in items:
+        indent_xml(item, level=2)
+        cost = len(ET.tostring(item, encoding="unicode").encode("utf-8"))
+        if not over_budget and total + cost <= max_bytes:
+            channel.append(item)
+            total += cost
+        else:
+            # Stop at the first item that doesn't fit, so the feed has no gaps
+            over_budget = True
+        report.append({"title": item.findtext("title"), "bytes": cost, "included": not over_budget})
+
+    # The per-item costs ignore the indentation of the closing tags, double-check
+    kept = [entry for entry in report if entry["included"]]
+    while kept and len(render_feed(rss).encode("utf-8")) > max_bytes:
+        channel.remove(channel.findall("item")[-1])
+        kept.pop()["included"] = False
+
+    return report
+
+
+def print_byte_report(report: list[dict], feed_bytes: int, max_bytes: int) -> None:
+    print(f"{'bytes':>8}  {'':8}  title")
+    for entry in report:
+        status = "" if entry["included"] else "dropped"
+        print(f"{entry['bytes']:>8}  {status:8}  {entry['title']}")
+    kept = sum(1 for entry in report if entry["included"])
+    print(f"Feed size: {feed_bytes} bytes (budget {max_bytes}), {kept}/{len(report)} items")
+
+
+class FeedWatcher(FileSystemEventHandler):
+    """
+    Keeps the feed up to date in-process while the site is being rebuilt.
+
+    Posts and their extracted content are kept in memory; a change to a
+    .md source reloads only that post, and a change to a rendered post
+    HTML only re-parses it if its contents actually changed.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        minify: bool = False,
+        summary_only: bool = False,
+        max_bytes: int | None = None,
+    ):
+        config = load_config()
+        self.output_dir = output_dir
+        self.minify = minify
+        self.summary_only = summary_only
+        self.max_bytes = max_bytes
+        self.siteurl = config["SITEURL"]
+        self.sitename = config["SITENAME"]
+        self.feed_path = output_dir / "feed.xml"
+
+        self.posts: dict[Path, dict] = {}
+        # Rendered HTML path -> source .md, for every post (even unpublished)
+        self.sources: dict[Path, Path] = {}
+        # Rendered HTML path -> (raw HTML, extracted content)
+        self.contents: dict[Path, tuple[str, str]] = {}
+
+        self.lock = threading.Lock()
+        self.pending: set[Path] = set()
+        self.last_event = 0.0
+        self.changed = threading.Event()
+
+        self.observer = Observer()
+        self.output_watch = None
+
+        for md_file in BLOG_DIR.glob("*.md"):
+            self.reload_source(md_file)
+
+    def reload_source(self, md_file: Path) -> None:
+        self.posts.pop(md_file, None)
+        if not md_file.exists():
+            self.sources = {h: m for h, m in self.sources.items() if m != md_file}
+            return
+
+        meta, _ = parse_frontmatter(md_file.read_text(encoding="utf-8"))
+        html_file = get_output_path(md_file, meta, self.output_dir)
+        if html_file is not None:
+            self.sources[html_file] = md_file
+
+        post = load_post(md_file, self.output_dir, self.siteurl)
+        if post is not None:
+            self.posts[md_file] = post
+
+    def extract_content(self, html_file: Path, article_url: str) -> str:
+        html = html_file.read_text(encoding="utf-8")
+        cached = self.contents.get(html_file)
+        if cached and cached[0] == html:
+            return cached[1]
+        content_html = extract_content_from_html(html, article_url, self.minify, self.summary_only)
+        self.contents[html_file] = (html, content_html)
+        return content_html
+
+    def is_relevant(self, path: Path) -> bool:
+        if path.suffix == ".md":
+            return path.parent == BLOG_DIR
+        if path.suffix == ".html":
+            return path in self.sources
+        return False
+
+    def watch_output_dir(self) -> None:
+        if self.output_watch is not None:
+            try:
+                self.observer.unschedule(self.output_watch)
+            except KeyError:
+                pass
+            self.output_watch = None
+        try:
+            self.output_watch = self.observer.schedule(self, str(self.output_dir), recursive=True)
+        except OSError:
+            # Removed again already, we'll re-attach when it's created next time
+            pass
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        if event.is_directory:
+            # `make clean-local` removes the whole output dir, which drops its
+            # watch: re-attach when it comes back and re-check every post
+            if event.event_type == "created" and Path(event.src_path) == self.output_dir:
+                self.watch_output_dir()
+                relevant = list(self.sources)
+            else:
+                return
+        else:
+            paths = [Path(event.src_path)]
+            if getattr(event, "dest_path", ""):
+                paths.append(Path(event.dest_path))
+            relevant = [path for path in paths if self.is_relevant(path)]
+        if not relevant:
+            return
+        with self.lock:
+            self.pending.update(relevant)
+            self.last_event = time.monotonic()
+        self.changed.set()
+
+    def take_pending(self) -> set[Path]:
+        """Wait for a burst of events to settle and return the changed paths."""
+        self.changed.wait()
+        while True:
+            with self.lock:
+                quiet_for = time.monotonic() - self.last_event
+                if quiet_for >= WATCH_DEBOUNCE_SECONDS:
+                    paths, self.pending = self.pending, set()
+                    self.changed.clear()
+                    return paths
+            time.sleep(WATCH_DEBOUNCE_SECONDS - quiet_for)
+
+    def apply_changes(self, paths: set[Path]) -> None:
+        for path in paths:
+            if path.suffix == ".md":
+                self.reload_source(path)
+            elif path in self.sources:
+                # The rendered HTML may have appeared or disappeared
+                self.reload_source(self.sources[path])
+
+    def regenerate(self) -> bool:
+        """Regenerate the feed, returning True if feed.xml was rewritten."""
+        posts = sorted(self.posts.values(), key=lambda p: p["date"], reverse=True)[:FEED_SIZE]
+        live = {post["html_file"] for post in posts}
+        self.contents = {h: c for h, c in self.contents.items() if h in live}
+
+        rss = build_rss(posts, self.sitename, self.siteurl, extract=self.extract_content)
+        if self.max_bytes:
+            apply_byte_budget(rss, self.max_bytes)
+        feed = render_feed(rss)
+        try:
+            if self.feed_path.read_text(encoding="utf-8") == feed:
+                return False
+        except OSError:
+            pass
+        try:
+            self.feed_path.write_text(feed, encoding="utf-8")
+        except FileNotFoundError:
+            # The output dir was removed meanwhile, we'll regenerate once it's rebuilt
+            return False
+        return True
+
+    def update(self, paths: set[Path]) -> None:
+        """Apply a batch of changes and regenerate the feed."""
+        start = time.perf_counter()
+        try:
+            self.apply_changes(paths)
+            if not self.output_dir.exists():
+                return
+            written = self.regenerate()
+        except Exception as e:
+            # Most likely clean-local removed the output dir half-way, or a
+            # post was caught half-saved: the next change will trigger another
+            # try. Never let the daemon die, as make watch relies on it.
+            print(f"Could not regenerate feed, retrying on next change: {e!r}")
+            with self.lock:
+                self.pending.update(paths)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        status = "Written" if written else "Unchanged"
+        print(f"{status}: {self.feed_path} ({len(paths)} changed files, {elapsed:.0f} ms)")
+
+    def run(self) -> None:
+        self.observer.schedule(self, str(BLOG_DIR), recursive=False)
+        # Watch the parent too, to notice the output dir being (re)created
+        self.observer.schedule(self, str(self.output_dir.parent), recursive=False)
+        self.observer.start()
+
+        if self.output_dir.exists():
+            self.watch_output_dir()
+            self.update(set())
+        else:
+            print(f"Waiting for output directory: {self.output_dir}")
+        print("Watching for changes...")
+
+        try:
+            while True:
+                self.update(self.take_pending())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.observer.stop()
+            self.observer.join()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate RSS feed for the blog")
     parser.add_argument(
@@ -204,9 +595,38 @@ def main():
         default="output",
         help="Output directory (default: output)",
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and regenerate the feed when posts change",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Minify the HTML content of each item",
+    )
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help=f"Cut item content at the {SUMMARY_MARKER} marker, when the post has one",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        help="Only include items while the feed stays under this size, and report item sizes",
+    )
     args = parser.parse_args()
 
     output_dir = Path(args.output_dir).resolve()
+
+    # In watch mode, the output dir may be (re)built after we start, e.g. by `make watch`
+    if args.watch:
+        if not output_dir.parent.exists():
+            print(f"Error: output directory parent does not exist: {output_dir.parent}")
+            raise SystemExit(1)
+        FeedWatcher(output_dir, args.minify, args.summary_only, args.max_bytes).run()
+        return
+
     if not output_dir.exists():
         print(f"Error: output directory does not exist: {output_dir}")
         raise SystemExit(1)
@@ -214,14 +634,17 @@ def main():
     posts, sitename, siteurl = load_posts(output_dir)
     print(f"Found {len(posts)} published English posts")
 
-    rss = build_rss(posts, sitename, siteurl)
-    indent_xml(rss)
-
-    tree = ET.ElementTree(rss)
+    extract = functools.partial(
+        extract_content, minify=args.minify, summary_only=args.summary_only
+    )
+    rss = build_rss(posts, sitename, siteurl, extract=extract)
+    report = apply_byte_budget(rss, args.max_bytes) if args.max_bytes else None
+    feed = render_feed(rss)
     feed_path = output_dir / "feed.xml"
-    with open(feed_path, "w", encoding="utf-8") as f:
-        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-        tree.write(f, encoding="unicode", xml_declaration=False)
+    feed_path.write_text(feed, encoding="utf-8")
+
+    if report is not None:
+        print_byte_report(report, len(feed.encode("utf-8")), args.max_bytes)
 
     print(f"Written: {feed_path}")
 
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Generate a static search index from blog posts.
+
+Reads the same published English posts as the RSS feed, extracts the text
+of their rendered entry-content and writes a prefix-sharded index to
+OUTPUT_DIR/search/:
+
+    posts.json          [[title, url, date], ...], position is the post id
+    manifest.json       {"prefix_length": N, "shards": [prefix, ...]}
+    shards/<prefix>.json
+                        {term: [post_id, ...]} for every term starting
+                        with <prefix>
+
+A client normalizes the query the same way as tokenize() and only fetches
+the shards for the prefixes of the query terms, so the download size for
+a search doesn't grow with the whole archive. There's no such client on
+the site yet, so the index is only built for local output (compile-dev),
+not deployed by compile-prod.
+
+Post ids are assigned oldest first, so publishing a post newer than all
+the others leaves existing ids (and most shards) unchanged; back-dating or
+unpublishing a post shifts the ids of every post after it. The terms of
+each post are cached in .cache/ keyed by a hash of its rendered HTML and
+its title, so re-runs only parse the posts whose content changed (even
+after a clean rebuild rewrote every file), and those are parsed in
+parallel.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from gen_rss import BASE_DIR, find_entry_content, find_published_posts, load_config
+
+CACHE_DIR = BASE_DIR / ".cache"
+CACHE_VERSION = 2
+
+PREFIX_LENGTH = 2
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 30
+
+STOPWORDS = {
+    "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "if",
+    "in", "into", "is", "it", "its", "of", "on", "or", "so", "that", "the",
+    "this", "to", "was", "were", "with",
+}
+
+TERM_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, strip accents and split text into indexable terms."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    ascii_text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return [
+        term
+        for term in TERM_RE.findall(ascii_text)
+        if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH
+        and term not in STOPWORDS
+    ]
+
+
+def index_post(html_file: Path, title: str) -> list[str]:
+    """Return the sorted unique terms of a post's title and content."""
+    entry_div = find_entry_content(html_file.read_text(encoding="utf-8"))
+    text = entry_div.get_text(" ") if entry_div else ""
+    return sorted(set(tokenize(f"{title} {text}")))
+
+
+def cache_path(output_dir: Path) -> Path:
+    return CACHE_DIR / f"search-{output_dir.name}.json"
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("posts", {})
+
+
+def save_cache(path: Path, entries: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"version": CACHE_VERSION, "posts": entries}
+    path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+
+def collect_terms(posts: list[dict], cache: dict, jobs: int) -> tuple[dict, int]:
+    """
+    Get the terms of every post, parsing only those not in the cache.
+    Returns (cache entries keyed by post url, number of posts parsed).
+    """
+    entries = {}
+    stale = []
+    for post in posts:
+        digest = hashlib.sha256(post["html_file"].read_bytes()).hexdigest()
+        cached = cache.get(post["url"])
+        if cached and cached["hash"] == digest and cached["title"] == post["title"]:
+            entries[post["url"]] = cached
+        else:
+            stale.append((post, digest))
+
+    if stale:
+        html_files = [post["html_file"] for post, _ in stale]
+        titles = [post["title"] for post, _ in stale]
+        if jobs == 1 or len(stale) == 1:
+            results = map(index_post, html_files, titles)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(index_post, html_files, titles, chunksize=4))
+        for (post, digest), terms in zip(stale, results):
+            entries[post["url"]] = {
+                "hash": digest,
+                "title": post["title"],
+                "terms": terms,
+            }
+
+    return entries, len(stale)
+
+
+def build_shards(posts: list[dict], entries: dict) -> dict[str, dict[str, list[int]]]:
+    """Invert post terms into {prefix: {term: [post_id, ...]}}."""
+    shards: dict[str, dict[str, list[int]]] = {}
+    for post_id, post in enumerate(posts):
+        for term in entries[post["url"]]["terms"]:
+            shard = shards.setdefault(term[:PREFIX_LENGTH], {})
+            shard.setdefault(term, []).append(post_id)
+    return shards
+
+
+def write_if_changed(path: Path, data) -> bool:
+    """Write data as compact JSON, skipping the write if the file is up to date."""
+    content = json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+    try:
+        if path.read_text(encoding="utf-8") == content:
+            return False
+    except OSError:
+        pass
+    path.write_text(content, encoding="utf-8")
+    return True
+
+
+def write_index(search_dir: Path, posts: list[dict], shards: dict) -> tuple[int, int]:
+    """Write the index files. Returns (number of files written, total bytes)."""
+    shards_dir = search_dir / "shards"
+    shards_dir.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    written += write_if_changed(
+        search_dir / "posts.json",
+        [[post["title"], post["url"], post["date"].strftime("%Y-%m-%d")] for post in posts],
+    )
+    written += write_if_changed(
+        search_dir / "manifest.json",
+        {"prefix_length": PREFIX_LENGTH, "shards": sorted(shards)},
+    )
+    for prefix, shard in shards.items():
+        written += write_if_changed(shards_dir / f"{prefix}.json", shard)
+
+    # Drop shards for prefixes no longer in use
+    for shard_file in shards_dir.glob("*.json"):
+        if shard_file.stem not in shards:
+            shard_file.unlink()
+
+    total_bytes = sum(f.stat().st_size for f in search_dir.rglob("*.json"))
+    return written, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate static search index for the blog")
+    parser.add_argument(
+        "--output-dir",
+        default="output",
+        help="Output directory (default: output)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes for parsing posts (default: CPU count)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the cache and re-parse every post",
+    )
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir).resolve()
+    if not output_dir.exists():
+        print(f"Error: output directory does not exist: {output_dir}")
+        raise SystemExit(1)
+
+    config = load_config()
+    # Oldest first, so that new posts get new ids instead of shifting old ones
+    posts = find_published_posts(output_dir, config["SITEURL"])[::-1]
+
+    cache_file = cache_path(output_dir)
+    cache = {} if args.full else load_cache(cache_file)
+    entries, parsed = collect_terms(posts, cache, max(1, args.jobs))
+    save_cache(cache_file, entries)
+    print(f"Indexed {len(posts)} published English posts ({parsed} parsed, {len(posts) - parsed} cached)")
+
+    shards = build_shards(posts, entries)
+    search_dir = output_dir / "search"
+    written, total_bytes = write_index(search_dir, posts, shards)
+
+    term_count = sum(len(shard) for shard in shards.values())
+    print(f"Written: {search_dir} ({term_count} terms in {len(shards)} shards, "
+          f"{written} files updated, {total_bytes} bytes total)")
+
+
+if __name__ == "__main__":
+    main()